@@ -5,18 +5,15 @@ Streamlit API 服務器
 import streamlit as st
 import streamlit.components.v1 as components
 from pathlib import Path
-import json
+import hashlib
+import hmac
 import sys
-from datetime import datetime
+import orjson
 
 # 添加 backend 到路徑
 sys.path.insert(0, str(Path(__file__).parent / 'backend'))
 
-from config import AppConfig
-from database.supabase_client import SupabaseClient
-from api.ai_service import AIService
-from api.weather_service import WeatherService
-from api.wardrobe_service import WardrobeService
+from frontend_loader import load_frontend_html
 
 # ========== 頁面配置 ==========
 st.set_page_config(
@@ -52,165 +49,266 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ========== 初始化服務 ==========
+# 各服務在首次使用時才匯入對應的後端模組，
+# 例如 ?api=weather 不會載入 Supabase，純前端頁面不會載入任何後端
 @st.cache_resource
-def init_services():
-    """初始化所有服務"""
+def get_config():
+    """載入應用設定"""
+    from config import AppConfig
+    
     config = AppConfig.from_secrets()
     if config is None:
         config = AppConfig.from_env()
+    return config
+
+@st.cache_resource
+def get_supabase():
+    """取得 Supabase 客戶端，未配置時回傳 None"""
+    config = get_config()
+    if not config.supabase_url:
+        return None
     
-    services = {
-        'config': config,
-        'supabase': SupabaseClient(config.supabase_url, config.supabase_key) if config.supabase_url else None,
-        'ai': AIService(config.gemini_api_key) if config.gemini_api_key else None,
-        'weather': WeatherService(config.weather_api_key) if config.weather_api_key else None
-    }
+    from database.supabase_client import SupabaseClient
+    return SupabaseClient(config.supabase_url, config.supabase_key)
+
+@st.cache_resource
+def get_ai_service():
+    """取得 AI 服務，未配置時回傳 None"""
+    config = get_config()
+    if not config.gemini_api_key:
+        return None
+    
+    from api.ai_service import AIService
+    return AIService(config.gemini_api_key)
+
+@st.cache_resource
+def get_weather_service():
+    """取得天氣服務，未配置時回傳 None"""
+    config = get_config()
+    if not config.weather_api_key:
+        return None
+    
+    from api.weather_service import WeatherService
+    return WeatherService(config.weather_api_key)
+
+@st.cache_resource
+def get_password_hasher():
+    """取得 argon2 密碼雜湊器 (單次雜湊約 50 ms)"""
+    from argon2 import PasswordHasher
     
-    return services
+    return PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+
+@st.cache_resource
+def get_dummy_password_hash():
+    """產生固定的 argon2 雜湊，供查無帳號時執行同等耗時的驗證"""
+    return get_password_hasher().hash('dummy-password')
 
-services = init_services()
+@st.cache_resource
+def get_upgraded_user_ids():
+    """本行程內已完成雜湊升級的使用者 ID (登入快取中的升級旗標在 TTL 內不會更新)"""
+    return set()
 
-# ========== 讀取並渲染前端 ==========
+# ========== 渲染前端 ==========
 def load_frontend():
     """載入完整的前端應用"""
-    frontend_dir = Path(__file__).parent / 'frontend'
-    
-    # 讀取 HTML
-    html_file = frontend_dir / 'index.html'
-    with open(html_file, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
-    # 讀取 CSS
-    css_files = ['style.css', 'upload.css', 'wardrobe.css', 'recommendation.css']
-    css_content = ''
-    for css_file in css_files:
-        css_path = frontend_dir / 'css' / css_file
-        if css_path.exists():
-            with open(css_path, 'r', encoding='utf-8') as f:
-                css_content += f.read() + '\n'
-    
-    # 讀取 JS
-    js_files = ['api.js', 'app.js', 'upload.js', 'wardrobe.js', 'recommendation.js']
-    js_content = ''
-    for js_file in js_files:
-        js_path = frontend_dir / 'js' / js_file
-        if js_path.exists():
-            with open(js_path, 'r', encoding='utf-8') as f:
-                js_content += f.read() + '\n'
-    
-    # 組合完整的 HTML
-    full_html = html_content.replace('</head>', f'<style>{css_content}</style></head>')
-    full_html = full_html.replace('</body>', f'<script>{js_content}</script></body>')
-    
-    # 渲染
-    components.html(full_html, height=1000, scrolling=True)
+    html, error = load_frontend_html()
+    if error:
+        st.error(f"前端載入失敗: {error}")
+        return
+    
+    components.html(html, height=1000, scrolling=True)
+
+# ========== 固定錯誤回應 ==========
+# 只會被序列化輸出，不可修改內容
+_ERR_UNKNOWN_API = {'success': False, 'message': 'Unknown API endpoint'}
+_ERR_DB_NOT_CONFIGURED = {'success': False, 'message': 'Database not configured'}
+_ERR_INVALID_CREDENTIALS = {'success': False, 'message': '帳號或密碼錯誤'}
+_ERR_USERNAME_TAKEN = {'success': False, 'message': '使用者名稱已存在'}
+
+# PostgreSQL unique_violation 錯誤碼
+_PG_UNIQUE_VIOLATION = '23505'
 
 # ========== API 處理函數 ==========
-def handle_api_request():
-    """處理 API 請求"""
-    # 獲取請求參數
-    query_params = st.query_params
-    
-    if 'api' not in query_params:
+def handle_api_request(params):
+    """處理 API 請求 (params 為本次請求的查詢參數快照)"""
+    if 'api' not in params:
         return None
     
-    api_endpoint = query_params['api']
+    # 路由到對應的 API 處理函數
+    handler = _API_TABLE.get(params['api'])
+    if handler is None:
+        return _ERR_UNKNOWN_API
     
     try:
-        # 路由到對應的 API 處理函數
-        if api_endpoint == 'login':
-            return api_login()
-        elif api_endpoint == 'register':
-            return api_register()
-        elif api_endpoint == 'weather':
-            return api_weather()
-        elif api_endpoint == 'upload':
-            return api_upload()
-        elif api_endpoint == 'wardrobe':
-            return api_wardrobe()
-        elif api_endpoint == 'delete':
-            return api_delete_item()
-        elif api_endpoint == 'batch_delete':
-            return api_batch_delete()
-        elif api_endpoint == 'recommendation':
-            return api_recommendation()
-        else:
-            return {'success': False, 'message': 'Unknown API endpoint'}
+        return handler(params)
     except Exception as e:
         return {'success': False, 'message': str(e)}
 
 # ========== API 端點實現 ==========
-def api_login():
+def api_login(params):
     """登入 API"""
-    username = st.query_params.get('username', '')
-    password = st.query_params.get('password', '')
+    username = params.get('username', '')
+    password = params.get('password', '')
     
-    if not services['supabase']:
-        return {'success': False, 'message': 'Database not configured'}
+    supabase = get_supabase()
+    if not supabase:
+        return _ERR_DB_NOT_CONFIGURED
     
     try:
-        result = services['supabase'].client.table("users")\
-            .select("*")\
-            .eq("username", username)\
-            .eq("password", password)\
-            .execute()
+        password_hash = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        try:
+            user_id, needs_upgrade = lookup_user(username, password_hash, password)
+        except InvalidCredentials:
+            return _ERR_INVALID_CREDENTIALS
         
-        if result.data:
-            return {
-                'success': True,
-                'user_id': result.data[0]['id'],
-                'username': username
-            }
-        else:
-            return {'success': False, 'message': '帳號或密碼錯誤'}
+        if needs_upgrade:
+            upgrade_password_hash(supabase, user_id, password)
+        return {
+            'success': True,
+            'user_id': user_id,
+            'username': username
+        }
     except Exception as e:
         return {'success': False, 'message': str(e)}
 
-def api_register():
-    """註冊 API"""
-    username = st.query_params.get('username', '')
-    password = st.query_params.get('password', '')
+class InvalidCredentials(Exception):
+    """帳號或密碼錯誤 (以例外跳出，避免失敗結果被快取)"""
+
+@st.cache_data(ttl=60, max_entries=1024, show_spinner=False)
+def lookup_user(username, password_hash, _password):
+    """驗證帳號密碼，回傳 (使用者 ID, 是否需升級雜湊)，失敗時拋出 InvalidCredentials
     
-    if not services['supabase']:
-        return {'success': False, 'message': 'Database not configured'}
+    以密碼的 SHA-256 作為快取鍵，明文不參與快取；
+    只快取成功結果，快取命中時可同時省去資料庫查詢與 argon2 驗證
+    """
+    from argon2.exceptions import InvalidHashError, VerificationError
     
+    result = get_supabase().client.table("users")\
+        .select("id, password")\
+        .eq("username", username)\
+        .maybe_single()\
+        .execute()
+    # 查無資料時部分 postgrest 版本直接回傳 None
+    user = result.data if result else None
+    stored = (user or {}).get('password') or ''
+    hasher = get_password_hasher()
+    
+    if stored.startswith('$argon2'):
+        try:
+            hasher.verify(stored, _password)
+        except (VerificationError, InvalidHashError):
+            raise InvalidCredentials(username) from None
+        return user['id'], hasher.check_needs_rehash(stored)
+    
+    # 查無帳號或舊明文密碼時，仍對固定雜湊驗證一次，
+    # 讓所有路徑耗時相近，無法藉回應時間探測帳號是否存在
     try:
-        # 檢查用戶名是否存在
-        existing = services['supabase'].client.table("users")\
-            .select("id")\
-            .eq("username", username)\
+        hasher.verify(get_dummy_password_hash(), _password)
+    except VerificationError:
+        pass
+    
+    if not user or not stored:
+        raise InvalidCredentials(username)
+    
+    # 舊帳號以明文儲存，驗證成功後由呼叫端升級為 argon2 雜湊
+    if not hmac.compare_digest(stored.encode('utf-8'), _password.encode('utf-8')):
+        raise InvalidCredentials(username)
+    return user['id'], True
+
+def upgrade_password_hash(supabase, user_id, password):
+    """將使用者密碼更新為目前參數的 argon2 雜湊 (失敗時不影響登入)"""
+    upgraded = get_upgraded_user_ids()
+    if user_id in upgraded:
+        return
+    
+    try:
+        supabase.client.table("users")\
+            .update({"password": get_password_hasher().hash(password)})\
+            .eq("id", user_id)\
             .execute()
-        
-        if existing.data:
-            return {'success': False, 'message': '使用者名稱已存在'}
-        
-        # 創建新用戶
-        result = services['supabase'].client.table("users")\
-            .insert({"username": username, "password": password})\
+    except Exception:
+        # 下次登入時會再嘗試升級
+        return
+    
+    upgraded.add(user_id)
+
+def api_register(params):
+    """註冊 API"""
+    username = params.get('username', '')
+    password = params.get('password', '')
+    
+    supabase = get_supabase()
+    if not supabase:
+        return _ERR_DB_NOT_CONFIGURED
+    
+    from postgrest.exceptions import APIError
+    
+    try:
+        # 直接插入，由 users.username 的唯一約束判斷是否重複 (省去一次查詢)
+        hashed = get_password_hasher().hash(password)
+        supabase.client.table("users")\
+            .insert({"username": username, "password": hashed})\
             .execute()
-        
-        return {'success': True, 'message': '註冊成功'}
+    except APIError as e:
+        if e.code == _PG_UNIQUE_VIOLATION:
+            return _ERR_USERNAME_TAKEN
+        return {'success': False, 'message': str(e)}
     except Exception as e:
         return {'success': False, 'message': str(e)}
+    
+    return {'success': True, 'message': '註冊成功'}
 
-def api_weather():
+def api_weather(params):
     """天氣 API"""
-    city = st.query_params.get('city', 'Taipei')
+    city = params.get('city', 'Taipei')
     
-    if not services['weather']:
+    if not get_weather_service():
         return None
     
-    weather = services['weather'].get_weather(city)
-    if weather:
-        return weather.to_dict()
-    return None
+    try:
+        return fetch_weather(city)
+    except WeatherUnavailable:
+        return None
+
+class WeatherUnavailable(Exception):
+    """天氣查詢失敗 (以例外跳出，避免失敗結果被快取)"""
+
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_weather(city):
+    """查詢城市天氣 (跨 session 共用，10 分鐘內不重複呼叫外部 API)"""
+    weather = get_weather_service().get_weather(city)
+    if not weather:
+        raise WeatherUnavailable(city)
+    return weather.to_dict()
+
+# API 路由表 (端點名稱 -> 處理函數)
+_API_TABLE = {
+    'login': api_login,
+    'register': api_register,
+    'weather': api_weather,
+}
+
+# ========== API 回應 ==========
+def render_api_response(result):
+    """輸出 API 回應 (以 orjson 預先序列化，st.json 收到字串時不再經過 json.dumps)"""
+    try:
+        body = orjson.dumps(result, default=repr, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        # orjson 無法處理的內容 (例如超過 64 位元的整數) 交回 st.json 以 json.dumps 序列化
+        st.json(result)
+        return
+    
+    st.json(body.decode('utf-8'))
 
 # ========== 主程式 ==========
 def main():
+    # 取得查詢參數快照，後續只做一般 dict 存取
+    params = st.query_params.to_dict()
+    
     # 檢查是否是 API 請求
-    if 'api' in st.query_params:
-        result = handle_api_request()
-        st.json(result)
+    if 'api' in params:
+        result = handle_api_request(params)
+        render_api_response(result)
     else:
         # 渲染前端
         load_frontend()
@@ -0,0 +1,142 @@
+"""
+前端資源載入
+合併 frontend/ 下的 CSS/JS 並內嵌進 index.html
+"""
+import functools
+import hashlib
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+FRONTEND_DIR = Path(__file__).parent / 'frontend'
+CSS_FILES = ['style.css', 'upload.css', 'wardrobe.css', 'recommendation.css']
+JS_FILES = ['api.js', 'app.js', 'upload.js', 'wardrobe.js', 'recommendation.js']
+
+# 由 tools/build_bundle.py 預先產生的合併檔
+BUNDLE_CSS = FRONTEND_DIR / 'bundle.css'
+BUNDLE_JS = FRONTEND_DIR / 'bundle.js'
+
+# 組合後的 HTML 磁碟快取，第一行記錄來源檔案的最新 mtime
+BUNDLE_FILE = FRONTEND_DIR / '.bundle.html'
+
+# 匹配 index.html 中引用外部 CSS/JS 的標籤，內嵌後需一次性移除
+_STRIP_RE = re.compile(
+    r'<link rel="stylesheet" href="css/[^"]+\.css">|<script src="js/[^"]+\.js"></script>'
+)
+
+def source_paths():
+    """回傳存在的 CSS 與 JS 來源檔案路徑"""
+    css_paths = [p for p in (FRONTEND_DIR / 'css' / name for name in CSS_FILES) if p.exists()]
+    js_paths = [p for p in (FRONTEND_DIR / 'js' / name for name in JS_FILES) if p.exists()]
+    return css_paths, js_paths
+
+def concat_sources(paths):
+    """依序合併來源檔案內容 (並行讀取，最後一次解碼)"""
+    if not paths:
+        return ''
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        blobs = list(executor.map(Path.read_bytes, paths))
+    blobs.append(b'')
+    return b'\n'.join(blobs).decode('utf-8')
+
+def _sources_key(paths):
+    """以每個檔案的路徑、mtime 與大小計算快取鍵"""
+    fingerprint = hashlib.sha1()
+    for path in paths:
+        stat = path.stat()
+        fingerprint.update(f'{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n'.encode('utf-8'))
+    return fingerprint.hexdigest()
+
+def bundle_header(paths):
+    """bundle 的首行註解，記錄產生時的來源檔案指紋 (CSS/JS 皆適用)"""
+    return f'/*sources={_sources_key(paths)}*/\n'
+
+def _read_bundle(bundle_path, paths):
+    """bundle 的來源指紋與目前來源檔案相符時直接讀取，否則即時合併"""
+    try:
+        bundle = bundle_path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return concat_sources(paths)
+
+    header, sep, payload = bundle.partition('\n')
+    if sep and header + sep == bundle_header(paths):
+        return payload
+    return concat_sources(paths)
+
+def _cache_header(key, payload):
+    """磁碟快取的首行，記錄快取鍵與內容摘要"""
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    return f'<!--key={key} sha1={digest}-->\n'
+
+def _read_cache(key):
+    """讀取磁碟快取，快取鍵不符或內容不完整時回傳 None"""
+    try:
+        cached = BUNDLE_FILE.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    header, sep, payload = cached.partition('\n')
+    if not sep or header + sep != _cache_header(key, payload):
+        return None
+    return payload
+
+def _write_cache(key, payload):
+    """寫入磁碟快取 (先寫暫存檔再原子替換，避免讀到寫到一半的檔案)"""
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=FRONTEND_DIR, prefix='.bundle.', suffix='.tmp')
+    except OSError:
+        # 唯讀檔案系統時僅略過磁碟快取
+        return
+
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(_cache_header(key, payload))
+            f.write(payload)
+        os.replace(tmp_path, BUNDLE_FILE)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+def build_html():
+    """組合前端 HTML，冷啟動時優先讀取磁碟快取"""
+    html_file = FRONTEND_DIR / 'index.html'
+    css_paths, js_paths = source_paths()
+    bundles = [p for p in (BUNDLE_CSS, BUNDLE_JS) if p.exists()]
+
+    # 以所有來源檔案 (含本模組的組合邏輯) 的清單作為快取鍵，新增、刪除或修改皆會失效
+    sources = [Path(__file__), html_file, *css_paths, *js_paths, *bundles]
+    key = _sources_key(sources)
+
+    cached = _read_cache(key)
+    if cached is not None:
+        return cached
+
+    html_content = html_file.read_text(encoding='utf-8')
+    css_content = _read_bundle(BUNDLE_CSS, css_paths)
+    js_content = _read_bundle(BUNDLE_JS, js_paths)
+
+    # 組合完整的 HTML (先一次性移除外部引用，再於 </head>、</body> 前注入內嵌內容)
+    html_content = _STRIP_RE.sub('', html_content)
+    head, head_end, rest = html_content.partition('</head>')
+    body, body_end, tail = rest.partition('</body>')
+    full_html = ''.join((
+        head, '<style>', css_content, '</style>', head_end,
+        body, '<script>', js_content, '</script>', body_end, tail,
+    ))
+
+    _write_cache(key, full_html)
+    return full_html
+
+# 前端檔案在行程生命週期內不會改變，首次呼叫時組合一次即可
+# (Streamlit 每次 rerun 都會重新執行 app.py，但不會重新匯入此模組，快取得以保留)
+@functools.lru_cache(maxsize=None)
+def load_frontend_html():
+    """回傳 (前端 HTML, 錯誤訊息)，組合失敗時 HTML 為 None"""
+    try:
+        return build_html(), None
+    except (OSError, UnicodeDecodeError) as e:
+        return None, str(e)
@@ -0,0 +1,7 @@
+-- users.username 唯一約束
+-- 註冊 API 直接插入並以 unique_violation (23505) 判斷使用者名稱重複，必須先套用此約束
+--
+-- 套用前請先確認沒有重複的使用者名稱，否則 ALTER TABLE 會失敗：
+--   SELECT username, COUNT(*) FROM users GROUP BY username HAVING COUNT(*) > 1;
+
+ALTER TABLE users ADD CONSTRAINT users_username_key UNIQUE (username);
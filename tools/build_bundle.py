@@ -0,0 +1,56 @@
+"""
+前端打包工具
+將 frontend/css 與 frontend/js 合併為 frontend/bundle.css 與 frontend/bundle.js
+
+用法:
+    python tools/build_bundle.py            # 只合併
+    python tools/build_bundle.py --minify   # 合併並壓縮 (需安裝 csscompressor / rjsmin)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from frontend_loader import BUNDLE_CSS, BUNDLE_JS, bundle_header, concat_sources, source_paths
+
+def minify_css(css):
+    """壓縮 CSS，未安裝 csscompressor 時原樣回傳"""
+    try:
+        from csscompressor import compress
+    except ImportError:
+        print("⚠️ 未安裝 csscompressor，略過 CSS 壓縮")
+        return css
+    return compress(css)
+
+def minify_js(js):
+    """壓縮 JS，未安裝 rjsmin 時原樣回傳"""
+    try:
+        from rjsmin import jsmin
+    except ImportError:
+        print("⚠️ 未安裝 rjsmin，略過 JS 壓縮")
+        return js
+    return jsmin(js)
+
+def main():
+    parser = argparse.ArgumentParser(description="打包前端 CSS/JS")
+    parser.add_argument('--minify', action='store_true', help="壓縮輸出的 bundle")
+    args = parser.parse_args()
+
+    css_paths, js_paths = source_paths()
+    css_content = concat_sources(css_paths)
+    js_content = concat_sources(js_paths)
+
+    if args.minify:
+        css_content = minify_css(css_content)
+        js_content = minify_js(js_content)
+
+    # 首行記錄來源檔案指紋，來源有任何增刪改時執行期會改為即時合併
+    BUNDLE_CSS.write_text(bundle_header(css_paths) + css_content, encoding='utf-8')
+    BUNDLE_JS.write_text(bundle_header(js_paths) + js_content, encoding='utf-8')
+
+    print(f"✅ {BUNDLE_CSS.name}: {len(css_content.encode('utf-8'))} bytes")
+    print(f"✅ {BUNDLE_JS.name}: {len(js_content.encode('utf-8'))} bytes")
+
+if __name__ == "__main__":
+    main()